@@ -0,0 +1,676 @@
+import io
+import sys
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import selectinload
+from marshmallow import ValidationError
+from werkzeug.exceptions import HTTPException, InternalServerError
+from werkzeug.routing import Map, Rule
+from werkzeug.wrappers import Request, Response
+
+from Mainpage import (
+    READ_METHODS, REPLICA_BIND, STREAM_BATCH_SIZE,
+    User, Order, Product_Table, Order_Product, Order_Total, User_Spend,
+    UserSchema, OrderSchema, Product_TableSchema, Order_ProductSchema, Order_TotalSchema, User_SpendSchema,
+    bulk_add_order_lines, bulk_create_products, bulk_create_users, bulk_delete_products, bulk_delete_users,
+    bulk_remove_order_lines, bulk_update_products, bulk_update_users, create_app, db, drop_product_sales,
+    drop_user_spend, engine_options, get_bulk_ids, get_bulk_payload, get_order_expansions, get_page_args,
+    get_search_args, get_top_products_args, increment_aggregate, instrumentation, load_order_lines,
+    order_detail_options, order_detail_schema, product_search_rows, record_order_lines, register_sqlite_foreign_keys,
+    reprice_product, search_index_rows, search_products_query, split_bulk_ids, top_products_query,
+)
+
+ASYNC_DRIVERS = {
+    'sqlite': 'sqlite+aiosqlite',
+    'mysql': 'mysql+aiomysql',
+    'postgresql': 'postgresql+asyncpg',
+}
+
+ROUTES = [
+    ('/users', ['POST'], 'create_user'),
+    ('/users/bulk', ['POST'], 'create_users_bulk'),
+    ('/users/bulk', ['PUT'], 'update_users_bulk'),
+    ('/users/bulk', ['DELETE'], 'delete_users_bulk'),
+    ('/users', ['GET'], 'get_users'),
+    ('/users/<int:id>', ['GET'], 'get_user'),
+    ('/users/<int:id>', ['PUT'], 'update_user'),
+    ('/users/<int:id>', ['DELETE'], 'delete_user'),
+    ('/products', ['GET'], 'get_products'),
+    ('/products/search', ['GET'], 'search_products'),
+    ('/products/<int:id>', ['GET'], 'get_product'),
+    ('/products', ['POST'], 'create_product'),
+    ('/products/<int:id>', ['PUT'], 'update_product'),
+    ('/products/<int:id>', ['DELETE'], 'delete_product'),
+    ('/products/bulk', ['POST'], 'create_products_bulk'),
+    ('/products/bulk', ['PUT'], 'update_products_bulk'),
+    ('/products/bulk', ['DELETE'], 'delete_products_bulk'),
+    ('/cache/stats', ['GET'], 'get_cache_stats'),
+    ('/orders', ['POST'], 'create_order'),
+    ('/orders/<int:order_id>', ['GET'], 'get_order'),
+    ('/orders/<int:order_id>/products', ['GET'], 'get_order_products'),
+    ('/orders/<int:order_id>/add_product/<int:product_id>', ['POST'], 'add_product_to_order'),
+    ('/orders/<int:order_id>/remove_product', ['DELETE'], 'remove_product_from_order'),
+    ('/orders/<int:order_id>/products/bulk', ['POST'], 'add_products_to_order_bulk'),
+    ('/orders/<int:order_id>/products/bulk', ['DELETE'], 'remove_products_from_order_bulk'),
+    ('/orders/<int:order_id>/total', ['GET'], 'get_order_total'),
+    ('/users/<int:user_id>/spend', ['GET'], 'get_user_spend'),
+    ('/products/top', ['GET'], 'get_top_products'),
+    ('/orders/user/<int:user_id>', ['GET'], 'get_orders_by_user'),
+]
+
+CACHED_ENDPOINTS = {
+    'get_users': User,
+    'get_user': User,
+    'get_products': Product_Table,
+    'search_products': Product_Table,
+    'get_product': Product_Table,
+}
+
+
+def async_database_url(url):
+    url = make_url(url)
+    return url.set(drivername=ASYNC_DRIVERS.get(url.get_backend_name(), url.drivername))
+
+
+def build_environ(scope, body):
+    server_name, server_port = scope.get('server') or ('localhost', 80)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', '').encode().decode('latin-1'),
+        'PATH_INFO': scope['path'].encode().decode('latin-1'),
+        'QUERY_STRING': scope['query_string'].decode('latin-1'),
+        'SERVER_NAME': server_name,
+        'SERVER_PORT': str(server_port),
+        'SERVER_PROTOCOL': f"HTTP/{scope['http_version']}",
+        'CONTENT_LENGTH': str(len(body)),
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': False,
+        'wsgi.multiprocess': False,
+        'wsgi.run_once': False,
+    }
+
+    for name, value in scope['headers']:
+        name, value = name.decode('latin-1'), value.decode('latin-1')
+        if name == 'content-type':
+            environ['CONTENT_TYPE'] = value
+        elif name != 'content-length':
+            key = 'HTTP_' + name.upper().replace('-', '_')
+            environ[key] = f"{environ[key]},{value}" if key in environ else value
+
+    return environ
+
+
+class StreamingResponse(Response):
+    def __init__(self, chunks, **kwargs):
+        super().__init__(**kwargs)
+        self.chunks = chunks
+        self.headers.pop('Content-Length', None)
+
+
+class AsyncAPI:
+    def __init__(self, config=None):
+        self.flask_app = create_app(config)
+
+        with self.flask_app.app_context():
+            primary_url = db.engine.url
+            replica_url = db.engines[REPLICA_BIND].url if REPLICA_BIND in db.engines else None
+
+        self.engine = self.create_engine(self.flask_app.config.get("ASYNC_DATABASE_URL") or primary_url)
+        self.read_engine = self.create_engine(replica_url) if replica_url else self.engine
+        self.sessions = async_sessionmaker(self.engine, expire_on_commit=False)
+        self.read_sessions = async_sessionmaker(self.read_engine, expire_on_commit=False)
+        self.url_map = Map([Rule(rule, methods=methods, endpoint=endpoint) for rule, methods, endpoint in ROUTES])
+
+    def create_engine(self, url):
+        url = async_database_url(url)
+        engine = create_async_engine(url, **engine_options(self.flask_app.config, url))
+        register_sqlite_foreign_keys(engine.sync_engine)
+        if self.flask_app.config["INSTRUMENTATION_ENABLED"]:
+            instrumentation.register_engine(engine.sync_engine)
+        return engine
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            return await self.lifespan(receive, send)
+
+        body = b''
+        more_body = True
+        while more_body:
+            message = await receive()
+            body += message.get('body', b'')
+            more_body = message.get('more_body', False)
+
+        environ = build_environ(scope, body)
+        request = Request(environ)
+        sessions = self.read_sessions if request.method in READ_METHODS else self.sessions
+
+        async with sessions() as session:
+            response = await self.dispatch(request, session)
+            await self.send_response(send, request, response)
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await self.engine.dispose()
+                if self.read_engine is not self.engine:
+                    await self.read_engine.dispose()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def dispatch(self, request, session):
+        request.url_adapter = self.url_map.bind_to_environ(request.environ)
+
+        try:
+            request.endpoint, request.view_args = request.url_adapter.match()
+            view = getattr(self, request.endpoint)
+            model = CACHED_ENDPOINTS.get(request.endpoint)
+
+            if model is None or request.args.get('format') == 'ndjson':
+                return await view(request, session, **request.view_args)
+            return await self.cached_response(request, session, model, view)
+        except HTTPException as e:
+            return e.get_response(request.environ)
+        except Exception:
+            self.flask_app.logger.exception("Exception on %s [%s]", request.path, request.method)
+            return InternalServerError().get_response(request.environ)
+
+    async def send_response(self, send, request, response):
+        headers = [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in response.headers.items()]
+        await send({'type': 'http.response.start', 'status': response.status_code, 'headers': headers})
+
+        if request.method == 'HEAD':
+            await send({'type': 'http.response.body', 'body': b''})
+            return
+
+        if isinstance(response, StreamingResponse):
+            async for chunk in response.chunks:
+                await send({'type': 'http.response.body', 'body': chunk.encode(), 'more_body': True})
+            await send({'type': 'http.response.body', 'body': b''})
+            return
+
+        await send({'type': 'http.response.body', 'body': b''.join(response.get_app_iter(request.environ))})
+
+    async def cached_response(self, request, session, model, view):
+        response_cache = self.flask_app.extensions['response_cache']
+        key = response_cache.key(model.__tablename__, request.url)
+        entry = response_cache.get(key)
+        cache_status = 'HIT'
+
+        if entry is None:
+            response = await view(request, session, **request.view_args)
+            if response.status_code != 200 or isinstance(response, StreamingResponse):
+                return response
+            entry = response_cache.set(key, response)
+            cache_status = 'MISS'
+
+        response = Response(entry['body'], mimetype=entry['mimetype'], headers=entry['headers'])
+        response.headers['X-Cache'] = cache_status
+        response.set_etag(entry['etag'])
+        return response.make_conditional(request)
+
+    def invalidate_cache(self, model):
+        self.flask_app.extensions['response_cache'].invalidate(model.__tablename__)
+
+    def index_product(self, id, name, price):
+        search_index = self.flask_app.extensions.get('search_index')
+        if search_index is not None:
+            search_index.add(id, name, price)
+
+    def unindex_product(self, id):
+        search_index = self.flask_app.extensions.get('search_index')
+        if search_index is not None:
+            search_index.remove(id)
+
+    def jsonify(self, data, status=200):
+        response = self.flask_app.json.response(data)
+        response.status_code = status
+        return response
+
+    def stream_ndjson(self, session, model, query, schema, limit=None):
+        async def generate():
+            last_id = None
+            remaining = limit
+
+            while remaining is None or remaining > 0:
+                size = STREAM_BATCH_SIZE if remaining is None else min(STREAM_BATCH_SIZE, remaining)
+                batch = (query if last_id is None else query.where(model.id > last_id)).limit(size)
+
+                rows = (await session.scalars(batch)).all()
+                for row in rows:
+                    yield self.flask_app.json.dumps(schema.dump(row)) + '\n'
+                session.expunge_all()
+
+                if len(rows) < size:
+                    return
+                last_id = rows[-1].id
+                if remaining is not None:
+                    remaining -= len(rows)
+
+        return StreamingResponse(generate(), mimetype='application/x-ndjson')
+
+    async def paginated_response(self, request, session, model, schema, *criteria, options=()):
+        try:
+            limit, after = get_page_args(request.args)
+        except ValueError:
+            return self.jsonify({"error": "'limit' must be a positive integer and 'after' a non-negative integer."}, 400)
+
+        query = select(model).where(model.id > after, *criteria).options(*options).order_by(model.id)
+
+        if request.args.get('format') == 'ndjson':
+            return self.stream_ndjson(session, model, query, schema, limit if 'limit' in request.args else None)
+
+        rows = (await session.scalars(query.limit(limit + 1))).all()
+        page = rows[:limit]
+        response = self.jsonify(schema.dump(page, many=True))
+
+        if len(rows) > limit:
+            next_cursor = page[-1].id
+            next_url = request.url_adapter.build(
+                request.endpoint, dict(request.args.to_dict(), **request.view_args, limit=limit, after=next_cursor),
+                force_external=True,
+            )
+            response.headers['X-Next-Cursor'] = str(next_cursor)
+            response.headers['Link'] = f'<{next_url}>; rel="next"'
+
+        return response
+
+    async def create_user(self, request, session):
+        try:
+            user_data = UserSchema().load(request.json)
+
+            if not user_data.get('name') or not user_data.get('email'):
+                return self.jsonify({"error": "Both 'name' and 'email' are required."}, 400)
+
+        except ValidationError as e:
+            return self.jsonify(e.messages, 400)
+
+        new_user = User(name=user_data['name'], email=user_data['email'])
+
+        session.add(new_user)
+        await session.commit()
+        self.invalidate_cache(User)
+
+        return self.jsonify(UserSchema().dump(new_user), 201)
+
+    async def create_users_bulk(self, request, session):
+        try:
+            users_data = UserSchema(many=True).load(get_bulk_payload(request.json))
+        except ValidationError as e:
+            return self.jsonify(e.messages, 400)
+
+        results = await session.run_sync(bulk_create_users, users_data)
+        await session.commit()
+        self.invalidate_cache(User)
+
+        return self.jsonify(results, 201)
+
+    async def update_users_bulk(self, request, session):
+        try:
+            ids, items = split_bulk_ids(get_bulk_payload(request.json))
+            users_data = UserSchema(many=True).load(items)
+        except ValidationError as e:
+            return self.jsonify(e.messages, 400)
+
+        results = await session.run_sync(bulk_update_users, ids, users_data)
+        await session.commit()
+        self.invalidate_cache(User)
+
+        return self.jsonify(results)
+
+    async def delete_users_bulk(self, request, session):
+        try:
+            ids = get_bulk_ids(request.json)
+        except ValidationError as e:
+            return self.jsonify(e.messages, 400)
+
+        results = await session.run_sync(bulk_delete_users, ids)
+        await session.commit()
+        self.invalidate_cache(User)
+
+        return self.jsonify(results)
+
+    async def get_users(self, request, session):
+        return await self.paginated_response(request, session, User, UserSchema())
+
+    async def get_user(self, request, session, id):
+        user = await session.get(User, id)
+
+        if not user:
+            return self.jsonify({"error": "User not found."}, 404)
+
+        return self.jsonify(UserSchema().dump(user))
+
+    async def update_user(self, request, session, id):
+        user = await session.get(User, id)
+
+        if not user:
+            return self.jsonify({"message": "Invalid user id"}, 400)
+
+        try:
+            user_data = UserSchema().load(request.json)
+
+            if 'name' in user_data:
+                user.name = user_data['name']
+            if 'email' in user_data:
+                user.email = user_data['email']
+
+            await session.commit()
+            self.invalidate_cache(User)
+
+            return self.jsonify(UserSchema().dump(user))
+
+        except ValidationError as e:
+            return self.jsonify(e.messages, 400)
+
+    async def delete_user(self, request, session, id):
+        user = await session.get(User, id)
+
+        if not user:
+            return self.jsonify({"message": "User not found"}, 404)
+
+        await session.delete(user)
+        await session.run_sync(drop_user_spend, [id])
+        await session.commit()
+        self.invalidate_cache(User)
+
+        return self.jsonify({"message": f"User with id {id} has been deleted."})
+
+    async def get_products(self, request, session):
+        return await self.paginated_response(request, session, Product_Table, Product_TableSchema())
+
+    async def search_products(self, request, session):
+        try:
+            q, min_price, max_price, sort, limit = get_search_args(request.args)
+        except ValueError as e:
+            return self.jsonify({"error": str(e)}, 400)
+
+        search_index = self.flask_app.extensions.get('search_index')
+
+        if q and search_index is not None:
+            products = search_index_rows(search_index, q, min_price, max_price, sort, limit)
+        else:
+            query = search_products_query(q, min_price, max_price, sort, limit)
+            products = (await session.execute(query)).all()
+
+        return self.jsonify(product_search_rows.dump(products))
+
+    async def get_product(self, request, session, id):
+        product = await session.get(Product_Table, id)
+        if not product:
+            return self.jsonify({"error": "Product not found."}, 404)
+        return self.jsonify(Product_TableSchema().dump(product))
+
+    async def create_product(self, request, session):
+        try:
+            product_data = Product_TableSchema().load(request.json)
+
+            new_product = Product_Table(
+                product_name=product_data['product_name'],
+                price=product_data['price']
+            )
+
+            session.add(new_product)
+            await session.commit()
+            self.invalidate_cache(Product_Table)
+            self.index_product(new_product.id, product_data['product_name'], product_data['price'])
+
+            return self.jsonify(Product_TableSchema().dump(new_product), 201)
+
+        except ValidationError as e:
+            return self.jsonify(e.messages, 400)
+
+    async def update_product(self, request, session, id):
+        product = await session.get(Product_Table, id)
+
+        if not product:
+            return self.jsonify({"error": "Product not found."}, 404)
+
+        try:
+            product_data = Product_TableSchema().load(request.json)
+
+            if 'product_name' in product_data:
+                product.product_name = product_data['product_name']
+            if 'price' in product_data:
+                await session.run_sync(reprice_product, id, product.price, product_data['price'])
+                product.price = product_data['price']
+
+            await session.commit()
+            self.invalidate_cache(Product_Table)
+            self.index_product(id, product.product_name, product.price)
+
+            return self.jsonify(Product_TableSchema().dump(product))
+
+        except ValidationError as e:
+            return self.jsonify(e.messages, 400)
+
+    async def delete_product(self, request, session, id):
+        product = await session.get(Product_Table, id)
+
+        if not product:
+            return self.jsonify({"error": "Product not found."}, 404)
+
+        await session.delete(product)
+        await session.run_sync(drop_product_sales, [id])
+        await session.commit()
+        self.invalidate_cache(Product_Table)
+        self.unindex_product(id)
+
+        return self.jsonify({"message": f"Product with id {id} has been deleted."})
+
+    async def create_products_bulk(self, request, session):
+        try:
+            products_data = Product_TableSchema(many=True).load(get_bulk_payload(request.json))
+        except ValidationError as e:
+            return self.jsonify(e.messages, 400)
+
+        results = await session.run_sync(bulk_create_products, products_data)
+        await session.commit()
+        self.invalidate_cache(Product_Table)
+
+        for result, product_data in zip(results, products_data):
+            self.index_product(result["id"], product_data['product_name'], product_data['price'])
+
+        return self.jsonify(results, 201)
+
+    async def update_products_bulk(self, request, session):
+        try:
+            ids, items = split_bulk_ids(get_bulk_payload(request.json))
+            products_data = Product_TableSchema(many=True).load(items)
+        except ValidationError as e:
+            return self.jsonify(e.messages, 400)
+
+        results = await session.run_sync(bulk_update_products, ids, products_data)
+        await session.commit()
+        self.invalidate_cache(Product_Table)
+
+        for result, product_data in zip(results, products_data):
+            if result["status"] == "updated":
+                self.index_product(result["id"], product_data['product_name'], product_data['price'])
+
+        return self.jsonify(results)
+
+    async def delete_products_bulk(self, request, session):
+        try:
+            ids = get_bulk_ids(request.json)
+        except ValidationError as e:
+            return self.jsonify(e.messages, 400)
+
+        results = await session.run_sync(bulk_delete_products, ids)
+        await session.commit()
+        self.invalidate_cache(Product_Table)
+
+        for result in results:
+            if result["status"] == "deleted":
+                self.unindex_product(result["id"])
+
+        return self.jsonify(results)
+
+    async def get_cache_stats(self, request, session):
+        return self.jsonify(self.flask_app.extensions['response_cache'].stats())
+
+    async def create_order(self, request, session):
+        user_id = request.json.get('user_id')
+        order_date = request.json.get('order_date', func.now())
+
+        user = await session.get(User, user_id)
+        if not user:
+            return self.jsonify({"error": "User not found."}, 404)
+
+        new_order = Order(user_id=user_id, order_date=order_date)
+        session.add(new_order)
+        await session.run_sync(increment_aggregate, User_Spend, {"user_id": user_id}, order_count=1)
+        await session.commit()
+        await session.refresh(new_order)
+
+        return self.jsonify(OrderSchema().dump(new_order), 201)
+
+    async def get_order(self, request, session, order_id):
+        try:
+            expand = get_order_expansions(request.args)
+        except ValidationError as e:
+            return self.jsonify(e.messages, 400)
+
+        order = (await session.scalars(
+            select(Order).where(Order.id == order_id).options(*order_detail_options(expand))
+        )).first()
+
+        if not order:
+            return self.jsonify({"error": "Order not found."}, 404)
+
+        return self.jsonify(order_detail_schema(expand).dump(order))
+
+    async def get_order_products(self, request, session, order_id):
+        order = await session.get(Order, order_id, options=[selectinload(Order.order_products)])
+
+        if not order:
+            return self.jsonify({"error": "Order not found."}, 404)
+
+        order_products = order.order_products
+        return self.jsonify(Order_ProductSchema(many=True).dump(order_products))
+
+    async def add_product_to_order(self, request, session, order_id, product_id):
+        new_order_product = {"order_id": order_id, "product_id": product_id}
+
+        try:
+            await session.execute(insert(Order_Product).values(**new_order_product))
+            await session.run_sync(record_order_lines, order_id, [product_id])
+            await session.commit()
+        except IntegrityError:
+            await session.rollback()
+
+            if not await session.get(Order, order_id):
+                return self.jsonify({"error": "Order not found."}, 404)
+            if not await session.get(Product_Table, product_id):
+                return self.jsonify({"error": "Product not found."}, 404)
+
+            return self.jsonify({"error": "Product is already in this order."}, 400)
+
+        return self.jsonify(Order_ProductSchema().dump(new_order_product), 201)
+
+    async def remove_product_from_order(self, request, session, order_id):
+        product_id = request.json.get('product_id')
+        order = await session.get(Order, order_id)
+
+        if not order:
+            return self.jsonify({"error": "Order not found."}, 404)
+
+        order_product = (await session.scalars(
+            select(Order_Product).filter_by(order_id=order_id, product_id=product_id)
+        )).first()
+
+        if not order_product:
+            return self.jsonify({"error": "Product not found in this order."}, 404)
+
+        await session.delete(order_product)
+        await session.run_sync(record_order_lines, order_id, [product_id], sign=-1)
+        await session.commit()
+
+        return self.jsonify({"message": f"Product with id {product_id} has been removed from order {order_id}."})
+
+    async def add_products_to_order_bulk(self, request, session, order_id):
+        try:
+            product_ids = load_order_lines(request.json, order_id)
+        except ValidationError as e:
+            return self.jsonify(e.messages, 400)
+
+        if not await session.get(Order, order_id):
+            return self.jsonify({"error": "Order not found."}, 404)
+
+        results = await session.run_sync(bulk_add_order_lines, order_id, product_ids)
+        await session.commit()
+
+        return self.jsonify(results, 201)
+
+    async def remove_products_from_order_bulk(self, request, session, order_id):
+        try:
+            product_ids = load_order_lines(request.json, order_id)
+        except ValidationError as e:
+            return self.jsonify(e.messages, 400)
+
+        if not await session.get(Order, order_id):
+            return self.jsonify({"error": "Order not found."}, 404)
+
+        results = await session.run_sync(bulk_remove_order_lines, order_id, product_ids)
+        await session.commit()
+
+        return self.jsonify(results)
+
+    async def get_order_total(self, request, session, order_id):
+        order_total = await session.get(Order_Total, order_id)
+
+        if not order_total:
+            if not await session.get(Order, order_id):
+                return self.jsonify({"error": "Order not found."}, 404)
+            order_total = Order_Total(order_id=order_id, total=0, item_count=0)
+
+        return self.jsonify(Order_TotalSchema().dump(order_total))
+
+    async def get_user_spend(self, request, session, user_id):
+        user_spend = await session.get(User_Spend, user_id)
+
+        if not user_spend:
+            if not await session.get(User, user_id):
+                return self.jsonify({"error": "User not found."}, 404)
+            user_spend = User_Spend(user_id=user_id, total=0, item_count=0, order_count=0)
+
+        return self.jsonify(User_SpendSchema().dump(user_spend))
+
+    async def get_top_products(self, request, session):
+        try:
+            days, sort, limit = get_top_products_args(request.args)
+        except ValueError as e:
+            return self.jsonify({"error": str(e)}, 400)
+
+        return self.jsonify([row._asdict() for row in await session.execute(top_products_query(days, sort, limit))])
+
+    async def get_orders_by_user(self, request, session, user_id):
+        user = await session.get(User, user_id)
+
+        if not user:
+            return self.jsonify({"error": "User not found."}, 404)
+
+        try:
+            expand = get_order_expansions(request.args, {'products'})
+        except ValidationError as e:
+            return self.jsonify(e.messages, 400)
+
+        if not expand:
+            return await self.paginated_response(request, session, Order, OrderSchema(), Order.user_id == user_id)
+
+        return await self.paginated_response(
+            request, session, Order, order_detail_schema(expand), Order.user_id == user_id,
+            options=order_detail_options(expand),
+        )
+
+
+def create_asgi_app(config=None):
+    return AsyncAPI(config)
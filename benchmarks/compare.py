@@ -0,0 +1,51 @@
+import argparse
+import json
+
+METRICS = ('p50_ms', 'p95_ms', 'p99_ms', 'rps', 'queries_per_request', 'cache_hit_ratio')
+
+
+def change(before, after):
+    if before is None or after is None:
+        return None
+    if before == 0:
+        return 0.0 if after == 0 else None
+    return (after - before) / before * 100
+
+
+def compare(baseline, candidate):
+    rows = []
+    for phase, scenarios in candidate["results"].items():
+        for name, summary in scenarios.items():
+            previous = baseline["results"].get(phase, {}).get(name)
+            if previous is None:
+                continue
+            for metric in METRICS:
+                if metric in summary:
+                    rows.append((phase, name, metric, previous.get(metric), summary[metric], change(previous.get(metric), summary[metric])))
+    return rows
+
+
+def format_value(value):
+    return '-' if value is None else f"{value:.2f}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare two benchmark JSON reports.")
+    parser.add_argument('baseline')
+    parser.add_argument('candidate')
+    parser.add_argument('--threshold', type=float, default=0.0, help="Only show changes larger than this percentage.")
+    args = parser.parse_args(argv)
+
+    with open(args.baseline) as file:
+        baseline = json.load(file)
+    with open(args.candidate) as file:
+        candidate = json.load(file)
+
+    for phase, name, metric, before, after, delta in compare(baseline, candidate):
+        if delta is not None and abs(delta) < args.threshold:
+            continue
+        print(f"{phase:12} {name:28} {metric:20} {format_value(before):>10} -> {format_value(after):>10} ({format_value(delta)}%)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,417 @@
+import argparse
+import itertools
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from werkzeug.serving import WSGIRequestHandler, make_server
+
+from benchmarks.seed import DEFAULT_DATABASE_URL, SCALES, counts, load_app, seed
+
+Scenario = namedtuple('Scenario', 'name method build write record', defaults=(False, None))
+
+
+def random_id(rng, state, table):
+    return rng.randint(1, state[table])
+
+
+def unique_suffix(state):
+    return f"{os.getpid()}-{next(state['counter'])}"
+
+
+def price(rng):
+    return round(rng.uniform(0.5, 500), 2)
+
+
+def get(path):
+    return lambda rng, state: (path(rng, state), None)
+
+
+def record_ids(key):
+    def record(state, payload):
+        state[key].extend(item["id"] for item in payload if item.get("id"))
+
+    return record
+
+
+def delete_created(key, prefix):
+    def build(rng, state):
+        try:
+            return f"{prefix}/{state[key].pop()}", None
+        except IndexError:
+            return None
+
+    return build
+
+
+def add_line(rng, state):
+    order_id, product_id = random_id(rng, state, 'order'), random_id(rng, state, 'Product_Table')
+    state['order_lines'].append((order_id, product_id))
+    return f"/orders/{order_id}/add_product/{product_id}", None
+
+
+def add_lines(rng, state):
+    order_id = random_id(rng, state, 'order')
+    product_ids = [random_id(rng, state, 'Product_Table') for _ in range(20)]
+    state['bulk_order_lines'].append((order_id, product_ids))
+    return f"/orders/{order_id}/products/bulk", [{"product_id": product_id} for product_id in product_ids]
+
+
+def remove_lines(rng, state):
+    try:
+        order_id, product_ids = state['bulk_order_lines'].pop()
+    except IndexError:
+        return None
+    return f"/orders/{order_id}/products/bulk", [{"product_id": product_id} for product_id in product_ids]
+
+
+def delete_created_bulk(key, path, size=100):
+    def build(rng, state):
+        ids = [state[key].pop() for _ in range(min(size, len(state[key])))]
+        return (path, {"ids": ids}) if ids else None
+
+    return build
+
+
+def remove_line(rng, state):
+    try:
+        order_id, product_id = state['order_lines'].pop()
+    except IndexError:
+        return None
+    return f"/orders/{order_id}/remove_product", {"product_id": product_id}
+
+
+SCENARIOS = [
+    Scenario('users.list', 'GET', get(lambda rng, state: "/users")),
+    Scenario('users.list_page', 'GET', get(lambda rng, state: f"/users?limit=100&after={rng.randint(0, state['user'])}")),
+    Scenario('users.get', 'GET', get(lambda rng, state: f"/users/{random_id(rng, state, 'user')}")),
+    Scenario('products.list', 'GET', get(lambda rng, state: "/products")),
+    Scenario('products.list_page', 'GET', get(lambda rng, state: f"/products?limit=100&after={rng.randint(0, state['Product_Table'])}")),
+    Scenario('products.stream', 'GET', get(lambda rng, state: "/products?format=ndjson&limit=1000")),
+    Scenario('products.get', 'GET', get(lambda rng, state: f"/products/{random_id(rng, state, 'Product_Table')}")),
+    Scenario('orders.get', 'GET', get(lambda rng, state: f"/orders/{random_id(rng, state, 'order')}")),
+    Scenario('orders.get_expanded', 'GET', get(lambda rng, state: f"/orders/{random_id(rng, state, 'order')}?expand=products,user")),
+    Scenario('orders.products', 'GET', get(lambda rng, state: f"/orders/{random_id(rng, state, 'order')}/products")),
+    Scenario('orders.by_user', 'GET', get(lambda rng, state: f"/orders/user/{random_id(rng, state, 'user')}")),
+    Scenario('orders.by_user_expanded', 'GET', get(lambda rng, state: f"/orders/user/{random_id(rng, state, 'user')}?expand=products")),
+    Scenario('products.search', 'GET', get(lambda rng, state: f"/products/search?q=Product+{rng.randint(1, 999)}")),
+    Scenario('products.search_price', 'GET', get(lambda rng, state: (
+        f"/products/search?min_price={rng.randint(0, 400)}&max_price={rng.randint(400, 500)}&sort=price"
+    ))),
+    Scenario('orders.total', 'GET', get(lambda rng, state: f"/orders/{random_id(rng, state, 'order')}/total")),
+    Scenario('users.spend', 'GET', get(lambda rng, state: f"/users/{random_id(rng, state, 'user')}/spend")),
+    Scenario('products.top', 'GET', get(lambda rng, state: "/products/top?window=30d&limit=10")),
+    Scenario('products.top_all_time', 'GET', get(lambda rng, state: "/products/top?window=all&limit=10")),
+    Scenario('cache.stats', 'GET', get(lambda rng, state: "/cache/stats")),
+    Scenario('users.create', 'POST', lambda rng, state: (
+        "/users", {"name": "Bench User", "email": f"bench-{unique_suffix(state)}@example.com"},
+    ), True),
+    Scenario('users.bulk_create', 'POST', lambda rng, state: (
+        "/users/bulk", [{"name": "Bench User", "email": f"bulk-{unique_suffix(state)}@example.com"} for _ in range(100)],
+    ), True, record_ids('created_users')),
+    Scenario('users.update', 'PUT', lambda rng, state: (
+        f"/users/{random_id(rng, state, 'user')}",
+        {"name": "Renamed User", "email": f"renamed-{unique_suffix(state)}@example.com"},
+    ), True),
+    Scenario('users.bulk_update', 'PUT', lambda rng, state: (
+        "/users/bulk", [
+            {"id": random_id(rng, state, 'user'), "name": "Renamed User", "email": f"bulk-renamed-{unique_suffix(state)}@example.com"}
+            for _ in range(100)
+        ],
+    ), True),
+    Scenario('users.delete', 'DELETE', delete_created('created_users', "/users"), True),
+    Scenario('users.bulk_delete', 'DELETE', delete_created_bulk('created_users', "/users/bulk"), True),
+    Scenario('products.create', 'POST', lambda rng, state: (
+        "/products", {"product_name": "Bench Product", "price": price(rng)},
+    ), True),
+    Scenario('products.bulk_create', 'POST', lambda rng, state: (
+        "/products/bulk", [{"product_name": "Bulk Product", "price": price(rng)} for _ in range(100)],
+    ), True, record_ids('created_products')),
+    Scenario('products.update', 'PUT', lambda rng, state: (
+        f"/products/{random_id(rng, state, 'Product_Table')}", {"product_name": "Updated Product", "price": price(rng)},
+    ), True),
+    Scenario('products.bulk_update', 'PUT', lambda rng, state: (
+        "/products/bulk", [
+            {"id": random_id(rng, state, 'Product_Table'), "product_name": "Updated Product", "price": price(rng)}
+            for _ in range(100)
+        ],
+    ), True),
+    Scenario('products.delete', 'DELETE', delete_created('created_products', "/products"), True),
+    Scenario('products.bulk_delete', 'DELETE', delete_created_bulk('created_products', "/products/bulk"), True),
+    Scenario('orders.create', 'POST', lambda rng, state: (
+        "/orders", {"user_id": random_id(rng, state, 'user')},
+    ), True),
+    Scenario('orders.add_product', 'POST', add_line, True),
+    Scenario('orders.remove_product', 'DELETE', remove_line, True),
+    Scenario('orders.bulk_add_products', 'POST', add_lines, True),
+    Scenario('orders.bulk_remove_products', 'DELETE', remove_lines, True),
+]
+
+
+class TestClientDriver:
+    def __init__(self, app):
+        self.client = app.test_client()
+
+    def request(self, method, path, body):
+        response = self.client.open(path, method=method, json=body)
+        return response.status_code, response.get_data(), response.headers.get('X-Cache')
+
+
+class HttpDriver:
+    def __init__(self, base_url):
+        self.base_url = base_url.rstrip('/')
+
+    def request(self, method, path, body):
+        data = None if body is None else json.dumps(body).encode()
+        request = urllib.request.Request(self.base_url + path, data=data, method=method)
+        if data is not None:
+            request.add_header('Content-Type', 'application/json')
+
+        try:
+            with urllib.request.urlopen(request) as response:
+                return response.status, response.read(), response.headers.get('X-Cache')
+        except urllib.error.HTTPError as e:
+            return e.code, e.read(), e.headers.get('X-Cache')
+
+
+class QueryCounter:
+    def __init__(self, engine):
+        self.count = 0
+        event.listen(engine, 'before_cursor_execute', self.increment)
+
+    def increment(self, *args):
+        self.count += 1
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values) + 0.5) - 1))
+    return sorted_values[index]
+
+
+def summarize(latencies, statuses, cache_hits, elapsed, queries=None):
+    latencies = sorted(latencies)
+    summary = {
+        "requests": len(latencies),
+        "errors": sum(1 for status in statuses if status >= 500),
+        "non_2xx": sum(1 for status in statuses if not 200 <= status < 300),
+        "cache_hits": cache_hits,
+        "cache_hit_ratio": cache_hits / len(latencies) if latencies else None,
+        "p50_ms": percentile(latencies, 0.50),
+        "p95_ms": percentile(latencies, 0.95),
+        "p99_ms": percentile(latencies, 0.99),
+        "mean_ms": sum(latencies) / len(latencies) if latencies else None,
+        "rps": len(latencies) / elapsed if elapsed else None,
+    }
+    if queries is not None:
+        summary["queries_per_request"] = queries / len(latencies) if latencies else None
+    return summary
+
+
+def issue(driver, scenario, rng, state):
+    request = scenario.build(rng, state)
+    if request is None:
+        return None
+
+    path, body = request
+    started = time.perf_counter()
+    status, payload, cache = driver.request(scenario.method, path, body)
+    latency = (time.perf_counter() - started) * 1000
+
+    if scenario.record and 200 <= status < 300:
+        scenario.record(state, json.loads(payload))
+
+    return latency, status, cache == 'HIT'
+
+
+def run_sequential(driver, scenarios, state, iterations, warmup, query_counter):
+    rng = random.Random(1)
+    results = {}
+
+    for scenario in scenarios:
+        for _ in range(warmup):
+            issue(driver, scenario, rng, state)
+
+        latencies, statuses = [], []
+        cache_hits = 0
+        queries_before = query_counter.count
+        started = time.perf_counter()
+        for _ in range(iterations):
+            outcome = issue(driver, scenario, rng, state)
+            if outcome:
+                latencies.append(outcome[0])
+                statuses.append(outcome[1])
+                cache_hits += outcome[2]
+        elapsed = time.perf_counter() - started
+
+        results[scenario.name] = summarize(
+            latencies, statuses, cache_hits, elapsed, query_counter.count - queries_before,
+        )
+        print_summary('test_client', scenario.name, results[scenario.name])
+
+    return results
+
+
+def run_concurrent(driver, scenarios, state, requests, concurrency):
+    results = {}
+
+    for scenario in scenarios:
+        remaining = itertools.count()
+        latencies, statuses, cache_hits = [], [], []
+        lock = threading.Lock()
+
+        def worker(seed):
+            rng = random.Random(seed)
+            while next(remaining) < requests:
+                outcome = issue(driver, scenario, rng, state)
+                if outcome:
+                    with lock:
+                        latencies.append(outcome[0])
+                        statuses.append(outcome[1])
+                        cache_hits.append(outcome[2])
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            list(executor.map(worker, range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+        results[scenario.name] = summarize(latencies, statuses, sum(cache_hits), elapsed)
+        print_summary('wsgi', scenario.name, results[scenario.name])
+
+    return results
+
+
+def print_summary(phase, name, summary):
+    if not summary["requests"]:
+        print(f"{phase:12} {name:28} skipped", file=sys.stderr)
+        return
+
+    print(
+        f"{phase:12} {name:28} p50={summary['p50_ms']:8.2f}ms p95={summary['p95_ms']:8.2f}ms "
+        f"p99={summary['p99_ms']:8.2f}ms rps={summary['rps']:9.1f} non_2xx={summary['non_2xx']} "
+        f"cache_hits={summary['cache_hits']}",
+        file=sys.stderr,
+    )
+
+
+class QuietRequestHandler(WSGIRequestHandler):
+    def log_request(self, *args, **kwargs):
+        pass
+
+
+def serve(app, threads):
+    server = make_server('127.0.0.1', 0, app, threaded=threads > 1, request_handler=QuietRequestHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', 'HEAD'], text=True, stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def select_scenarios(names, include_writes):
+    scenarios = [scenario for scenario in SCENARIOS if include_writes or not scenario.write]
+    if names:
+        scenarios = [scenario for scenario in scenarios if scenario.name in names]
+    return scenarios
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark every product API route.")
+    parser.add_argument('--database-url', default=os.environ.get('DATABASE_URL', DEFAULT_DATABASE_URL))
+    parser.add_argument('--scale', choices=SCALES, default='10k')
+    parser.add_argument('--seed', action='store_true', help="Reset and seed the database before running.")
+    parser.add_argument('--iterations', type=int, default=200)
+    parser.add_argument('--warmup', type=int, default=20)
+    parser.add_argument('--requests', type=int, default=1000, help="Requests per scenario against the WSGI server.")
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--base-url', help="Benchmark an already running server instead of starting one.")
+    parser.add_argument('--skip-server', action='store_true')
+    parser.add_argument('--skip-test-client', action='store_true')
+    parser.add_argument('--server-writes', action='store_true', help="Also run write scenarios concurrently.")
+    parser.add_argument(
+        '--enable-cache', action='store_true',
+        help="Serve repeated GETs from the response cache; by default every request reaches the database.",
+    )
+    parser.add_argument('--search-index', action='store_true', help="Enable the in-memory product search index.")
+    parser.add_argument('--scenario', action='append', dest='scenarios', help="Only run the named scenario(s).")
+    parser.add_argument('--output', help="Write the JSON report to this file instead of stdout.")
+    args = parser.parse_args(argv)
+
+    config = {"SEARCH_INDEX_ENABLED": args.search_index}
+    if not args.enable_cache:
+        config["CACHE_MAX_ENTRIES"] = 0
+
+    app, db, models = load_app(args.database_url, **config)
+
+    with app.app_context():
+        sizes = seed(db, models, args.scale) if args.seed else counts(db, models)
+        query_counter = QueryCounter(db.engine)
+
+    state = dict(
+        sizes, counter=itertools.count(), created_users=[], created_products=[], order_lines=[], bulk_order_lines=[],
+    )
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "database_url": make_url(args.database_url).render_as_string(hide_password=True),
+            "rows": sizes,
+            "iterations": args.iterations,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "cache": args.enable_cache,
+            "search_index": args.search_index,
+            "python": platform.python_version(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+        },
+        "results": {},
+    }
+
+    if not args.skip_test_client:
+        report["results"]["test_client"] = run_sequential(
+            TestClientDriver(app), select_scenarios(args.scenarios, True), state,
+            args.iterations, args.warmup, query_counter,
+        )
+
+    if not args.skip_server:
+        server = None
+        base_url = args.base_url
+        if not base_url:
+            server, base_url = serve(app, args.concurrency)
+
+        try:
+            report["results"]["wsgi"] = run_concurrent(
+                HttpDriver(base_url), select_scenarios(args.scenarios, args.server_writes), state,
+                args.requests, args.concurrency,
+            )
+        finally:
+            if server:
+                server.shutdown()
+
+    output = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, 'w') as file:
+            file.write(output + '\n')
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
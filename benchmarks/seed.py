@@ -0,0 +1,114 @@
+import argparse
+import os
+import random
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, func, insert, select
+
+import Mainpage
+
+DEFAULT_DATABASE_URL = 'sqlite:///mydatabase.db'
+CHUNK_SIZE = 10000
+SEED = 1127
+
+SCALES = {
+    '10k': {"users": 1000, "products": 10000, "orders": 5000, "lines_per_order": 4},
+    '100k': {"users": 10000, "products": 100000, "orders": 50000, "lines_per_order": 4},
+    '1m': {"users": 100000, "products": 1000000, "orders": 500000, "lines_per_order": 4},
+}
+
+
+def chunked(rows, size=CHUNK_SIZE):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def generate_users(count):
+    for id in range(1, count + 1):
+        yield {"id": id, "name": f"User {id}", "email": f"user{id}@example.com"}
+
+
+def generate_products(count, rng):
+    for id in range(1, count + 1):
+        yield {"id": id, "product_name": f"Product {id}", "price": round(rng.uniform(0.5, 500), 2)}
+
+
+def generate_orders(count, users, rng):
+    start = datetime(2024, 1, 1)
+    for id in range(1, count + 1):
+        yield {
+            "id": id,
+            "user_id": rng.randint(1, users),
+            "order_date": start + timedelta(minutes=rng.randint(0, 60 * 24 * 365)),
+        }
+
+
+def generate_order_products(orders, products, lines_per_order, rng):
+    for order_id in range(1, orders + 1):
+        for product_id in rng.sample(range(1, products + 1), min(lines_per_order, products)):
+            yield {"order_id": order_id, "product_id": product_id}
+
+
+def seed(db, models, scale, reset=True):
+    User, Order, Product_Table, Order_Product = models
+    sizes = SCALES[scale]
+    rng = random.Random(SEED)
+
+    db.create_all()
+    if reset:
+        with db.engine.begin() as connection:
+            for model in (Order_Product, Order, Product_Table, User):
+                connection.execute(delete(model))
+
+    batches = (
+        (User, generate_users(sizes["users"])),
+        (Product_Table, generate_products(sizes["products"], rng)),
+        (Order, generate_orders(sizes["orders"], sizes["users"], rng)),
+        (Order_Product, generate_order_products(sizes["orders"], sizes["products"], sizes["lines_per_order"], rng)),
+    )
+
+    with db.engine.begin() as connection:
+        for model, rows in batches:
+            for chunk in chunked(rows):
+                connection.execute(insert(model), chunk)
+
+    Mainpage.rebuild_analytics(db.session)
+    db.session.commit()
+
+    return counts(db, models)
+
+
+def counts(db, models):
+    with db.engine.connect() as connection:
+        return {
+            model.__tablename__: connection.execute(select(func.count()).select_from(model)).scalar_one()
+            for model in models
+        }
+
+
+def load_app(database_url, **config):
+    app = Mainpage.create_app(dict(config, SQLALCHEMY_DATABASE_URI=database_url))
+    models = (Mainpage.User, Mainpage.Order, Mainpage.Product_Table, Mainpage.Order_Product)
+    return app, Mainpage.db, models
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Seed the product API database with benchmark data.")
+    parser.add_argument('--database-url', default=os.environ.get('DATABASE_URL', DEFAULT_DATABASE_URL))
+    parser.add_argument('--scale', choices=SCALES, default='10k')
+    parser.add_argument('--keep', action='store_true', help="Do not delete existing rows before seeding.")
+    args = parser.parse_args(argv)
+
+    app, db, models = load_app(args.database_url)
+    with app.app_context():
+        print(seed(db, models, args.scale, reset=not args.keep))
+
+
+if __name__ == '__main__':
+    main()
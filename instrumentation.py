@@ -0,0 +1,191 @@
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+from flask import Response, g, has_request_context, request
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+DURATION_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 250)
+
+
+class Histogram:
+    def __init__(self, name, help, buckets, labels=('method', 'route')):
+        self.name = name
+        self.help = help
+        self.buckets = buckets
+        self.labels = labels
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = {"buckets": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series["buckets"][index] += 1
+            series["sum"] += value
+            series["count"] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+
+        with self._lock:
+            for label_values, series in sorted(self._series.items()):
+                labels = ','.join(f'{name}="{escape_label(value)}"' for name, value in zip(self.labels, label_values))
+                for bound, count in zip(self.buckets, series["buckets"]):
+                    lines.append(f'{self.name}_bucket{{{labels},le="{bound}"}} {count}')
+                lines.append(f'{self.name}_bucket{{{labels},le="+Inf"}} {series["count"]}')
+                lines.append(f'{self.name}_sum{{{labels}}} {series["sum"]}')
+                lines.append(f'{self.name}_count{{{labels}}} {series["count"]}')
+
+        return lines
+
+
+class Counter:
+    def __init__(self, name, help):
+        self.name = name
+        self.help = help
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self):
+        with self._lock:
+            self.value += 1
+
+    def render(self):
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter", f"{self.name} {self.value}"]
+
+
+def escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class RequestMetrics:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.timings = {"db": 0.0, "serialize": 0.0}
+        self.active = set()
+
+
+class Instrumentation:
+    def __init__(self, app=None):
+        self.enabled = False
+        self.slow_query_threshold = None
+        self.request_duration = Histogram(
+            'http_request_duration_seconds', 'Total handler time per route.', DURATION_BUCKETS
+        )
+        self.db_duration = Histogram(
+            'http_request_db_duration_seconds', 'Time spent executing SQL per request.', DURATION_BUCKETS
+        )
+        self.serialize_duration = Histogram(
+            'http_request_serialize_duration_seconds', 'Time spent serializing response data per request.', DURATION_BUCKETS
+        )
+        self.query_count = Histogram(
+            'http_request_queries', 'SQL statements executed per request.', QUERY_COUNT_BUCKETS
+        )
+        self.slow_queries = Counter('db_slow_queries_total', 'SQL statements slower than the slow query threshold.')
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app, engines=()):
+        app.config.setdefault("INSTRUMENTATION_ENABLED", False)
+        app.config.setdefault("SLOW_QUERY_THRESHOLD_MS", 200)
+
+        if not app.config["INSTRUMENTATION_ENABLED"]:
+            return
+
+        self.enabled = True
+        threshold = app.config["SLOW_QUERY_THRESHOLD_MS"]
+        self.slow_query_threshold = threshold / 1000 if threshold is not None else None
+
+        for engine in engines:
+            self.register_engine(engine)
+
+        app.before_request(self.before_request)
+        app.after_request(self.after_request)
+        app.add_url_rule('/metrics', 'metrics', self.metrics, methods=['GET'])
+
+    def register_engine(self, engine):
+        if not event.contains(engine, 'before_cursor_execute', self.before_cursor_execute):
+            event.listen(engine, 'before_cursor_execute', self.before_cursor_execute)
+            event.listen(engine, 'after_cursor_execute', self.after_cursor_execute)
+
+    def current(self):
+        if not self.enabled or not has_request_context():
+            return None
+        return g.get('request_metrics')
+
+    def before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        context.query_start_time = time.perf_counter()
+
+    def after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - context.query_start_time
+        metrics = self.current()
+
+        if metrics is not None:
+            metrics.queries += 1
+            metrics.timings["db"] += elapsed
+
+        if self.slow_query_threshold is not None and elapsed >= self.slow_query_threshold:
+            self.slow_queries.inc()
+            logger.warning(
+                "Slow query (%.1f ms) on %s: %s",
+                elapsed * 1000,
+                request.path if has_request_context() else '<no request>',
+                statement,
+            )
+
+    @contextmanager
+    def timer(self, name):
+        metrics = self.current()
+
+        if metrics is None or name in metrics.active:
+            yield
+            return
+
+        metrics.active.add(name)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            metrics.timings[name] = metrics.timings.get(name, 0.0) + time.perf_counter() - started
+            metrics.active.discard(name)
+
+    def before_request(self):
+        g.request_metrics = RequestMetrics()
+
+    def after_request(self, response):
+        metrics = g.pop('request_metrics', None)
+        if metrics is None:
+            return response
+
+        total = time.perf_counter() - metrics.started
+        labels = (request.method, request.url_rule.rule if request.url_rule else 'unmatched')
+
+        self.request_duration.observe(total, *labels)
+        self.db_duration.observe(metrics.timings["db"], *labels)
+        self.serialize_duration.observe(metrics.timings["serialize"], *labels)
+        self.query_count.observe(metrics.queries, *labels)
+
+        response.headers['Server-Timing'] = ', '.join([
+            f'db;dur={metrics.timings["db"] * 1000:.3f};desc="{metrics.queries} queries"',
+            f'serialize;dur={metrics.timings["serialize"] * 1000:.3f}',
+            f'total;dur={total * 1000:.3f}',
+        ])
+        return response
+
+    def metrics(self):
+        lines = []
+        for metric in (self.request_duration, self.db_duration, self.serialize_duration, self.query_count, self.slow_queries):
+            lines.extend(metric.render())
+
+        return Response('\n'.join(lines) + '\n', mimetype='text/plain; version=0.0.4')
@@ -0,0 +1,60 @@
+import bisect
+import heapq
+import threading
+from itertools import islice
+
+PREFIX_END = chr(0x10ffff)
+
+
+def fold(text):
+    return (text or '').lower()
+
+
+class ProductSearchIndex:
+    SORT_KEYS = {
+        'price': lambda product: (product[2] is None, product[2] or 0, product[0]),
+        '-price': lambda product: (product[2] is None, -(product[2] or 0), product[0]),
+    }
+
+    def __init__(self):
+        self._products = {}
+        self._names = []
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._products)
+
+    def rebuild(self, rows):
+        with self._lock:
+            self._products = {id: (id, name, price) for id, name, price in rows}
+            self._names = sorted((fold(name), id) for id, name, _ in self._products.values())
+
+    def add(self, id, name, price):
+        with self._lock:
+            self.remove(id)
+            self._products[id] = (id, name, price)
+            bisect.insort(self._names, (fold(name), id))
+
+    def remove(self, id):
+        with self._lock:
+            product = self._products.pop(id, None)
+            if product is not None:
+                del self._names[bisect.bisect_left(self._names, (fold(product[1]), id))]
+
+    def matching(self, prefix):
+        start = bisect.bisect_left(self._names, (prefix,))
+        end = bisect.bisect_left(self._names, (prefix + PREFIX_END,), lo=start)
+        return (self._products[self._names[index][1]] for index in range(start, end))
+
+    def search(self, query, min_price=None, max_price=None, sort='name', limit=20):
+        with self._lock:
+            candidates = self.matching(fold(query))
+
+            if min_price is not None:
+                candidates = (product for product in candidates if product[2] is not None and product[2] >= min_price)
+            if max_price is not None:
+                candidates = (product for product in candidates if product[2] is not None and product[2] <= max_price)
+
+            if sort == 'name':
+                return list(islice(candidates, limit))
+            return heapq.nsmallest(limit, candidates, key=self.SORT_KEYS[sort])
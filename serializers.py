@@ -0,0 +1,63 @@
+from flask.json.provider import DefaultJSONProvider
+from marshmallow import fields
+from sqlalchemy.orm import ColumnProperty
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+CONVERTERS = (
+    (fields.DateTime, lambda value: value.isoformat()),
+    (fields.Float, float),
+    (fields.Integer, int),
+    (fields.String, str),
+)
+
+
+class RowSerializer:
+    def __init__(self, model, schema):
+        self.names = []
+        self.columns = []
+        self.converters = []
+
+        for name, field in sorted(schema.dump_fields.items()):
+            attribute = getattr(model, field.attribute or name, None)
+            converter = next((convert for field_class, convert in CONVERTERS if isinstance(field, field_class)), None)
+
+            if not isinstance(getattr(attribute, 'property', None), ColumnProperty):
+                raise TypeError(f"{type(schema).__name__}.{name} is not a column of {model.__name__}.")
+            if converter is None:
+                raise TypeError(f"{type(schema).__name__}.{name} has unsupported field type {type(field).__name__}.")
+
+            self.names.append(field.data_key or name)
+            self.columns.append(attribute)
+            self.converters.append(converter)
+
+    def to_dict(self, row):
+        return {
+            name: None if value is None else convert(value)
+            for name, convert, value in zip(self.names, self.converters, row)
+        }
+
+    def dump(self, rows):
+        return [self.to_dict(row) for row in rows]
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    def options(self):
+        option = orjson.OPT_SORT_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+        if self.compact is False or (self.compact is None and self._app.debug):
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=self.default, option=self.options()).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        body = orjson.dumps(obj, default=self.default, option=self.options() | orjson.OPT_APPEND_NEWLINE)
+        return self._app.response_class(body, mimetype=self.mimetype)
@@ -0,0 +1,29 @@
+import pytest
+
+from Mainpage import create_app
+
+
+@pytest.fixture
+def make_config(tmp_path):
+    def make(name, **config):
+        return dict({
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / name}.db",
+            "DATABASE_REPLICA_URL": None,
+            "CREATE_TABLES_ON_STARTUP": True,
+            "CACHE_MAX_ENTRIES": 0,
+            "INSTRUMENTATION_ENABLED": False,
+            "SEARCH_INDEX_ENABLED": False,
+            "FAST_JSON": False,
+        }, **config)
+
+    return make
+
+
+@pytest.fixture
+def app(make_config):
+    return create_app(make_config('app'))
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
@@ -0,0 +1,107 @@
+import pytest
+from sqlalchemy import event, select
+
+from Mainpage import Order_Total, Product_Sales, User_Spend, db, rebuild_analytics
+
+AGGREGATES = (Order_Total, User_Spend, Product_Sales)
+
+
+def snapshot():
+    tables = {}
+
+    for model in AGGREGATES:
+        keys = len(model.__table__.primary_key.columns)
+        rows = db.session.execute(select(*model.__table__.columns)).all()
+        tables[model.__tablename__] = sorted(
+            tuple(round(value, 6) if isinstance(value, float) else value for value in row)
+            for row in rows
+            if any(row[keys:])
+        )
+
+    return tables
+
+
+def assert_matches_rebuild(app):
+    with app.app_context():
+        incremental = snapshot()
+        rebuild_analytics(db.session)
+        rebuilt = snapshot()
+        db.session.rollback()
+
+    assert incremental == rebuilt
+
+
+@pytest.fixture
+def seeded(client):
+    client.post('/users/bulk', json=[{"name": f"user{i}", "email": f"user{i}@example.com"} for i in range(4)])
+    client.post('/products/bulk', json=[{"product_name": f"product{i}", "price": 1.25 * (i + 1)} for i in range(12)])
+    for user_id in (1, 1, 2, 3):
+        client.post('/orders', json={"user_id": user_id})
+    return client
+
+
+def test_single_line_changes_match_rebuild(app, seeded):
+    seeded.post('/orders/1/add_product/1')
+    seeded.post('/orders/1/add_product/2')
+    seeded.post('/orders/2/add_product/2')
+    seeded.post('/orders/3/add_product/2')
+    seeded.delete('/orders/1/remove_product', json={"product_id": 1})
+    assert_matches_rebuild(app)
+
+    seeded.put('/products/2', json={"product_name": "product1", "price": 9.5})
+    assert_matches_rebuild(app)
+
+    seeded.post('/orders/1/add_product/1')
+    seeded.put('/products/1', json={"product_name": "product0", "price": 0.75})
+    assert_matches_rebuild(app)
+
+
+def test_bulk_changes_match_rebuild(app, seeded):
+    seeded.post('/orders/1/products/bulk', json=[{"product_id": id} for id in (1, 2, 3, 4, 4, 99)])
+    seeded.post('/orders/2/products/bulk', json=[{"product_id": id} for id in (2, 3, 5)])
+    seeded.post('/orders/3/products/bulk', json=[{"product_id": id} for id in range(1, 13)])
+    seeded.post('/orders/4/products/bulk', json=[{"product_id": id} for id in (3, 6)])
+    assert_matches_rebuild(app)
+
+    seeded.delete('/orders/3/products/bulk', json=[{"product_id": id} for id in (2, 4, 6, 8, 99)])
+    assert_matches_rebuild(app)
+
+    seeded.put('/products/bulk', json=[
+        {"id": 2, "product_name": "product1", "price": 4},
+        {"id": 3, "product_name": "product2", "price": 0.5},
+        {"id": 2, "product_name": "product1", "price": 6.5},
+        {"id": 7, "product_name": "product6", "price": 7.25},
+        {"id": 99, "product_name": "missing", "price": 1},
+    ])
+    assert_matches_rebuild(app)
+
+
+def test_deletes_match_rebuild(app, seeded):
+    seeded.post('/orders/1/products/bulk', json=[{"product_id": id} for id in (1, 2, 3)])
+    seeded.post('/orders/3/products/bulk', json=[{"product_id": id} for id in (3, 4)])
+    seeded.post('/orders/4/products/bulk', json=[{"product_id": 5}])
+    seeded.delete('/orders/4/products/bulk', json=[{"product_id": 5}])
+
+    assert seeded.delete('/users/1').status_code == 200
+    assert seeded.delete('/users/bulk', json={"ids": [2, 3]}).status_code == 200
+    assert seeded.delete('/products/bulk', json={"ids": [4, 5]}).json == [
+        {"id": 4, "status": "in_use"},
+        {"id": 5, "status": "deleted"},
+    ]
+    assert_matches_rebuild(app)
+
+
+def test_bulk_upkeep_is_set_based(app, seeded):
+    statements = []
+    with app.app_context():
+        event.listen(db.engine, 'before_cursor_execute', lambda *args: statements.append(args[2]))
+
+    seeded.post('/orders/3/products/bulk', json=[{"product_id": id} for id in range(1, 13)])
+    assert len(statements) < 15
+
+    statements.clear()
+    seeded.put('/products/bulk', json=[
+        {"id": id, "product_name": f"product{id}", "price": id * 2.5} for id in range(1, 13)
+    ])
+    assert len(statements) < 15
+    assert_matches_rebuild(app)
@@ -0,0 +1,214 @@
+import asyncio
+import json
+import re
+
+import pytest
+
+import Mainpage
+import asgi
+from Mainpage import create_app
+from asgi import AsyncAPI
+
+ORDER_DATE = re.compile(rb'"order_date": ?"[^"]*"')
+COMPARED_HEADERS = ('Link', 'X-Cache', 'ETag')
+
+REPLAY = [
+    ('POST', '/users', {"name": "a", "email": "a@example.com"}),
+    ('POST', '/users', {"name": "b", "email": "not-an-email"}),
+    ('POST', '/users', {"name": "c", "email": "c@example.com"}),
+    ('POST', '/users', {"name": "d", "email": "d@example.com"}),
+    ('GET', '/users', None),
+    ('GET', '/users?limit=1', None),
+    ('GET', '/users?limit=1&after=1', None),
+    ('GET', '/users?limit=0', None),
+    ('GET', '/users?format=ndjson', None),
+    ('GET', '/users/1', None),
+    ('GET', '/users/99', None),
+    ('PUT', '/users/2', {"name": "C", "email": "cc@example.com"}),
+    ('PUT', '/users/99', {"name": "C", "email": "cc@example.com"}),
+    ('POST', '/users/bulk', [{"name": "e", "email": "e@example.com"}, {"name": "a", "email": "a@example.com"}]),
+    ('POST', '/users/bulk', {"name": "e", "email": "e@example.com"}),
+    ('PUT', '/users/bulk', [
+        {"id": 3, "name": "D", "email": "dd@example.com"},
+        {"id": 99, "name": "x", "email": "x@example.com"},
+        {"id": 4, "name": "E", "email": "a@example.com"},
+    ]),
+    ('PUT', '/users/bulk', [{"name": "x", "email": "x@example.com"}]),
+    ('GET', '/users', None),
+    ('GET', '/users', None),
+    ('POST', '/products', {"product_name": "Plain Saw", "price": 1.5}),
+    ('POST', '/products', {"product_name": "pro tool", "price": 2}),
+    ('POST', '/products', {"product_name": "Widget Pro", "price": 4.25}),
+    ('POST', '/products', {"price": 2}),
+    ('GET', '/products?limit=2', None),
+    ('GET', '/products?limit=x', None),
+    ('GET', '/products?format=ndjson&limit=2', None),
+    ('GET', '/products/2', None),
+    ('GET', '/products/99', None),
+    ('PUT', '/products/2', {"product_name": "Pro Tool", "price": 3}),
+    ('POST', '/products/bulk', [{"product_name": "Probe", "price": 7}, {"product_name": "Gizmo", "price": 0.5}]),
+    ('POST', '/products/bulk', [{"price": 7}]),
+    ('PUT', '/products/bulk', [
+        {"id": 4, "product_name": "Probe Kit", "price": 8},
+        {"id": 99, "product_name": "x", "price": 1},
+    ]),
+    ('GET', '/products/2', None),
+    ('GET', '/products/2', None),
+    ('GET', '/products/search?q=pro', None),
+    ('GET', '/products/search?q=P&sort=-price', None),
+    ('GET', '/products/search?q=w&min_price=4&max_price=5', None),
+    ('GET', '/products/search?sort=price&limit=2', None),
+    ('GET', '/products/search?q=pro&limit=abc', None),
+    ('GET', '/products/search?q=pro&min_price=nan', None),
+    ('POST', '/orders', {"user_id": 1}),
+    ('POST', '/orders', {"user_id": 1}),
+    ('POST', '/orders', {"user_id": 42}),
+    ('POST', '/orders/1/add_product/1', None),
+    ('POST', '/orders/1/add_product/1', None),
+    ('POST', '/orders/1/add_product/99', None),
+    ('POST', '/orders/99/add_product/1', None),
+    ('POST', '/orders/1/add_product/2', None),
+    ('POST', '/orders/2/add_product/2', None),
+    ('POST', '/orders/2/products/bulk', [{"product_id": 1}, {"product_id": 2}, {"product_id": 99}, {"product_id": 1}]),
+    ('POST', '/orders/99/products/bulk', [{"product_id": 1}]),
+    ('POST', '/orders/2/products/bulk', [{"nope": 1}]),
+    ('GET', '/orders/2/total', None),
+    ('PUT', '/products/bulk', [{"id": 1, "product_name": "Plain Saw", "price": 2.5}]),
+    ('GET', '/orders/2/total', None),
+    ('DELETE', '/orders/2/products/bulk', [{"product_id": 1}, {"product_id": 5}]),
+    ('DELETE', '/orders/99/products/bulk', [{"product_id": 1}]),
+    ('GET', '/orders/2/total', None),
+    ('GET', '/orders/1', None),
+    ('GET', '/orders/1?expand=products,user', None),
+    ('GET', '/orders/1?expand=nope', None),
+    ('GET', '/orders/99', None),
+    ('GET', '/orders/1/products', None),
+    ('GET', '/orders/99/products', None),
+    ('GET', '/orders/user/1', None),
+    ('GET', '/orders/user/1?limit=1', None),
+    ('GET', '/orders/user/1?expand=products&limit=1', None),
+    ('GET', '/orders/user/1?expand=products&format=ndjson', None),
+    ('GET', '/products?format=ndjson&after=1', None),
+    ('GET', '/orders/user/1?expand=user', None),
+    ('GET', '/orders/user/99', None),
+    ('PUT', '/products/2', {"product_name": "Pro Tool", "price": 5}),
+    ('GET', '/orders/1?expand=products', None),
+    ('GET', '/orders/1/total', None),
+    ('GET', '/orders/3/total', None),
+    ('GET', '/orders/99/total', None),
+    ('GET', '/users/1/spend', None),
+    ('GET', '/users/3/spend', None),
+    ('GET', '/users/99/spend', None),
+    ('GET', '/products/top', None),
+    ('GET', '/products/top?sort=units&window=all&limit=1', None),
+    ('GET', '/products/top?window=week', None),
+    ('DELETE', '/orders/1/remove_product', {"product_id": 2}),
+    ('DELETE', '/orders/1/remove_product', {"product_id": 2}),
+    ('DELETE', '/products/3', None),
+    ('DELETE', '/products/99', None),
+    ('GET', '/products/search?q=w', None),
+    ('DELETE', '/products/bulk', {"ids": [2, 5, 99]}),
+    ('DELETE', '/products/bulk', {"ids": "x"}),
+    ('GET', '/products/search?q=pro', None),
+    ('DELETE', '/users/2', None),
+    ('DELETE', '/users/99', None),
+    ('DELETE', '/users/1', None),
+    ('DELETE', '/users/bulk', {"ids": [3, 4, 99]}),
+    ('DELETE', '/users/bulk', [3]),
+    ('GET', '/orders/1', None),
+    ('GET', '/orders/1/total', None),
+    ('GET', '/users/1/spend', None),
+    ('GET', '/users', None),
+    ('GET', '/missing', None),
+    ('PATCH', '/users', None),
+    ('GET', '/cache/stats', None),
+]
+
+
+async def asgi_request(app, method, path, body=None, extra_headers=()):
+    path, _, query = path.partition('?')
+    content = b'' if body is None else json.dumps(body).encode()
+    headers = [(b'host', b'localhost'), *extra_headers]
+    if body is not None:
+        headers.append((b'content-type', b'application/json'))
+
+    scope = {
+        'type': 'http',
+        'http_version': '1.1',
+        'method': method,
+        'scheme': 'http',
+        'path': path,
+        'root_path': '',
+        'query_string': query.encode(),
+        'headers': headers,
+        'server': ('localhost', 80),
+    }
+    incoming = [{'type': 'http.request', 'body': content, 'more_body': False}]
+    sent = []
+
+    async def receive():
+        return incoming.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    await app(scope, receive, send)
+
+    headers = {name.decode(): value.decode() for name, value in sent[0]['headers']}
+    return sent[0]['status'], headers, b''.join(message.get('body', b'') for message in sent[1:])
+
+
+def normalize(body):
+    return ORDER_DATE.sub(b'"order_date":"<now>"', body)
+
+
+async def replay(flask_client, async_api, steps):
+    mismatches = []
+
+    for method, path, body in steps:
+        flask_response = flask_client.open(path, method=method, json=body)
+        status, headers, content = await asgi_request(async_api, method, path, body)
+
+        flask_result = (
+            flask_response.status_code, normalize(flask_response.data),
+            *(flask_response.headers.get(name) for name in COMPARED_HEADERS),
+        )
+        async_result = (status, normalize(content), *(headers.get(name.lower()) for name in COMPARED_HEADERS))
+        if flask_result != async_result:
+            mismatches.append((method, path, flask_result, async_result))
+
+    await async_api.engine.dispose()
+    return mismatches
+
+
+@pytest.mark.parametrize('cache_entries', [0, 100])
+@pytest.mark.parametrize('search_index', [False, True])
+def test_flask_and_asgi_responses_match(make_config, monkeypatch, search_index, cache_entries):
+    monkeypatch.setattr(Mainpage, 'STREAM_BATCH_SIZE', 2)
+    monkeypatch.setattr(asgi, 'STREAM_BATCH_SIZE', 2)
+    config = {"SEARCH_INDEX_ENABLED": search_index, "CACHE_MAX_ENTRIES": cache_entries}
+    flask_client = create_app(make_config('flask', **config)).test_client()
+    async_api = AsyncAPI(make_config('async', **config))
+
+    assert asyncio.run(replay(flask_client, async_api, REPLAY)) == []
+
+
+def test_asgi_serves_conditional_cached_responses(make_config):
+    async def run(async_api):
+        await asgi_request(async_api, 'POST', '/users', {"name": "a", "email": "a@example.com"})
+        first = await asgi_request(async_api, 'GET', '/users/1')
+        second = await asgi_request(async_api, 'GET', '/users/1')
+        conditional = await asgi_request(async_api, 'GET', '/users/1', extra_headers=[
+            (b'if-none-match', first[1]['etag'].encode()),
+        ])
+        await asgi_request(async_api, 'PUT', '/users/1', {"name": "b", "email": "a@example.com"})
+        changed = await asgi_request(async_api, 'GET', '/users/1')
+        await async_api.engine.dispose()
+        return first, second, conditional, changed
+
+    first, second, conditional, changed = asyncio.run(run(AsyncAPI(make_config('async', CACHE_MAX_ENTRIES=100))))
+
+    assert (first[0], first[1]['x-cache']) == (200, 'MISS')
+    assert (second[0], second[1]['x-cache'], second[2]) == (200, 'HIT', first[2])
+    assert (conditional[0], conditional[2]) == (304, b'')
+    assert (changed[1]['x-cache'], json.loads(changed[2])["name"]) == ('MISS', 'b')
@@ -0,0 +1,162 @@
+import pytest
+from sqlalchemy import event
+
+import Mainpage
+from Mainpage import db
+
+USERS = [{"name": f"user{i}", "email": f"user{i}@example.com"} for i in range(3)]
+PRODUCTS = [{"product_name": f"product{i}", "price": i + 0.5} for i in range(3)]
+
+
+@pytest.fixture
+def statements(app):
+    executed = []
+    with app.app_context():
+        event.listen(db.engine, 'before_cursor_execute', lambda *args: executed.append(args[2]))
+    return executed
+
+
+@pytest.mark.parametrize('method, path', [
+    ('POST', '/users/bulk'),
+    ('PUT', '/users/bulk'),
+    ('POST', '/products/bulk'),
+    ('PUT', '/products/bulk'),
+])
+@pytest.mark.parametrize('payload', [{"name": "a"}, [1, 2], "users"])
+def test_bulk_payload_must_be_a_list_of_objects(client, method, path, payload):
+    response = client.open(path, method=method, json=payload)
+
+    assert response.status_code == 400
+    assert response.json == ["Expected a JSON list of objects."]
+
+
+@pytest.mark.parametrize('path', ['/users/bulk', '/products/bulk'])
+@pytest.mark.parametrize('payload', [{"ids": "1"}, {"ids": [1, "2"]}, {"ids": [True]}, [1, 2]])
+def test_bulk_delete_requires_integer_ids(client, path, payload):
+    response = client.delete(path, json=payload)
+
+    assert response.status_code == 400
+    assert response.json == {"ids": ["Expected a list of integer ids."]}
+
+
+def test_bulk_item_cap(client, monkeypatch):
+    monkeypatch.setattr(Mainpage, 'MAX_BULK_ITEMS', 2)
+    message = ["At most 2 items are allowed per request."]
+
+    assert client.post('/products/bulk', json=PRODUCTS).json == message
+    assert client.delete('/users/bulk', json={"ids": [1, 2, 3]}).json == message
+    assert client.post('/products/bulk', json=PRODUCTS[:2]).status_code == 201
+
+
+def test_bulk_create_uses_one_insert(client, statements):
+    response = client.post('/products/bulk', json=PRODUCTS)
+
+    assert response.status_code == 201
+    assert response.json == [{"id": id, "status": "created"} for id in (1, 2, 3)]
+    assert sum(statement.startswith('INSERT') for statement in statements) == 1
+    assert [product['product_name'] for product in client.get('/products').json] == [
+        product['product_name'] for product in PRODUCTS
+    ]
+
+
+def test_bulk_create_without_returning(app, client, monkeypatch):
+    with app.app_context():
+        monkeypatch.setattr(db.engine.dialect, 'insert_returning', False)
+
+    response = client.post('/users/bulk', json=USERS)
+
+    assert response.json == [{"id": id, "status": "created"} for id in (1, 2, 3)]
+    assert client.get('/users/3').json == {"email": "user2@example.com", "name": "user2"}
+
+
+def test_bulk_create_users_reports_taken_emails(client):
+    client.post('/users', json=USERS[0])
+
+    response = client.post('/users/bulk', json=[USERS[1], USERS[0], USERS[2], USERS[1]])
+
+    assert response.status_code == 201
+    assert response.json == [
+        {"id": 2, "status": "created"},
+        {"id": None, "status": "email_taken"},
+        {"id": 3, "status": "created"},
+        {"id": None, "status": "email_taken"},
+    ]
+
+
+def test_bulk_update_users(client):
+    client.post('/users/bulk', json=USERS)
+
+    response = client.put('/users/bulk', json=[
+        {"id": 1, "name": "renamed", "email": "user0@example.com"},
+        {"id": 2, "name": "thief", "email": "user2@example.com"},
+        {"id": 9, "name": "ghost", "email": "ghost@example.com"},
+        {"id": 3, "name": "moved", "email": "new@example.com"},
+    ])
+
+    assert response.status_code == 200
+    assert response.json == [
+        {"id": 1, "status": "updated"},
+        {"id": 2, "status": "email_taken"},
+        {"id": 9, "status": "not_found"},
+        {"id": 3, "status": "updated"},
+    ]
+    assert [user['email'] for user in client.get('/users').json] == [
+        "user0@example.com", "user1@example.com", "new@example.com"
+    ]
+
+
+def test_bulk_update_requires_ids(client):
+    response = client.put('/products/bulk', json=[{"product_name": "x", "price": 1}, {"id": "2"}])
+
+    assert response.status_code == 400
+    assert response.json == {
+        "0": {"id": ["A valid integer id is required."]},
+        "1": {"id": ["A valid integer id is required."]},
+    }
+
+
+def test_bulk_delete_statuses(client):
+    client.post('/users/bulk', json=USERS)
+    client.post('/products/bulk', json=PRODUCTS)
+    client.post('/orders', json={"user_id": 1})
+    client.post('/orders/1/add_product/2')
+
+    assert client.delete('/users/bulk', json={"ids": [1, 7]}).json == [
+        {"id": 1, "status": "deleted"},
+        {"id": 7, "status": "not_found"},
+    ]
+    assert client.get('/orders/1').json['user_id'] is None
+    assert client.delete('/products/bulk', json={"ids": [1, 2, 7]}).json == [
+        {"id": 1, "status": "deleted"},
+        {"id": 2, "status": "in_use"},
+        {"id": 7, "status": "not_found"},
+    ]
+    assert [product['product_name'] for product in client.get('/products').json] == ["product1", "product2"]
+
+
+def test_bulk_order_lines(client):
+    client.post('/users', json=USERS[0])
+    client.post('/products/bulk', json=PRODUCTS)
+    client.post('/orders', json={"user_id": 1})
+    client.post('/orders/1/add_product/1')
+
+    added = client.post('/orders/1/products/bulk', json=[
+        {"product_id": 1}, {"product_id": 2}, {"product_id": 2}, {"product_id": 9},
+    ])
+    assert added.status_code == 201
+    assert added.json == [
+        {"product_id": 1, "status": "already_in_order"},
+        {"product_id": 2, "status": "added"},
+        {"product_id": 2, "status": "already_in_order"},
+        {"product_id": 9, "status": "product_not_found"},
+    ]
+
+    removed = client.delete('/orders/1/products/bulk', json=[{"product_id": 2}, {"product_id": 3}])
+    assert removed.json == [
+        {"product_id": 2, "status": "removed"},
+        {"product_id": 3, "status": "not_in_order"},
+    ]
+    assert client.get('/orders/1/products').json == [{"order_id": 1, "product_id": 1}]
+
+    assert client.post('/orders/9/products/bulk', json=[{"product_id": 1}]).status_code == 404
+    assert client.post('/orders/1/products/bulk', json=[{"product": 1}]).status_code == 400
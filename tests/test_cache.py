@@ -0,0 +1,130 @@
+import fnmatch
+
+import pytest
+
+from Mainpage import create_app
+from cache import RedisCache, ResponseCache
+
+
+class FakeRedis:
+    def __init__(self):
+        self.values = {}
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def set(self, key, value, ex=None):
+        self.values[key] = value
+
+    def delete(self, *keys):
+        for key in keys:
+            self.values.pop(key, None)
+
+    def incr(self, key):
+        self.values[key] = str(int(self.values.get(key, 0)) + 1)
+        return int(self.values[key])
+
+    def scan_iter(self, match, count=None):
+        return (key for key in list(self.values) if fnmatch.fnmatchcase(key, match))
+
+
+@pytest.fixture(params=['lru', 'redis'])
+def client(request, make_config):
+    config = make_config('cached', CACHE_MAX_ENTRIES=100)
+    if request.param == 'redis':
+        config["CACHE_BACKEND"] = RedisCache(FakeRedis())
+
+    client = create_app(config).test_client()
+    client.post('/users/bulk', json=[{"name": f"user{i}", "email": f"user{i}@example.com"} for i in range(3)])
+    client.post('/products/bulk', json=[{"product_name": f"product{i}", "price": i + 1} for i in range(3)])
+    return client
+
+
+def test_repeat_reads_hit_the_cache(client):
+    first = client.get('/users/1')
+    second = client.get('/users/1')
+
+    assert first.headers['X-Cache'] == 'MISS'
+    assert second.headers['X-Cache'] == 'HIT'
+    assert first.data == second.data
+    assert first.headers['ETag'] == second.headers['ETag']
+
+
+def test_matching_etag_returns_not_modified(client):
+    etag = client.get('/products?limit=2').headers['ETag']
+
+    response = client.get('/products?limit=2', headers={'If-None-Match': etag})
+
+    assert response.status_code == 304
+    assert response.data == b''
+    assert client.get('/products?limit=2', headers={'If-None-Match': '"other"'}).status_code == 200
+
+
+def test_paging_headers_are_cached(client):
+    client.get('/users?limit=1')
+    response = client.get('/users?limit=1')
+
+    assert response.headers['X-Cache'] == 'HIT'
+    assert response.headers['X-Next-Cursor'] == '1'
+    assert response.headers['Link'] == '<http://localhost/users?limit=1&after=1>; rel="next"'
+
+
+def test_cache_is_keyed_by_host(client):
+    client.get('/users?limit=1', headers={'Host': 'evil.example'})
+
+    response = client.get('/users?limit=1')
+
+    assert response.headers['X-Cache'] == 'MISS'
+    assert response.headers['Link'] == '<http://localhost/users?limit=1&after=1>; rel="next"'
+
+
+def test_errors_and_streams_are_not_cached(client):
+    for _ in range(2):
+        assert 'X-Cache' not in client.get('/users/99').headers
+        assert 'X-Cache' not in client.get('/users?format=ndjson').headers
+
+
+@pytest.mark.parametrize('read, method, path, payload', [
+    ('/users', 'POST', '/users', {"name": "new", "email": "new@example.com"}),
+    ('/users', 'PUT', '/users/1', {"name": "renamed", "email": "user0@example.com"}),
+    ('/users', 'DELETE', '/users/1', None),
+    ('/users', 'POST', '/users/bulk', [{"name": "new", "email": "new@example.com"}]),
+    ('/users', 'PUT', '/users/bulk', [{"id": 2, "name": "renamed", "email": "user1@example.com"}]),
+    ('/users', 'DELETE', '/users/bulk', {"ids": [3]}),
+    ('/products/search?q=product', 'POST', '/products', {"product_name": "product9", "price": 9}),
+    ('/products/search?q=product', 'PUT', '/products/1', {"product_name": "product0", "price": 5}),
+    ('/products/search?q=product', 'DELETE', '/products/1', None),
+    ('/products/search?q=product', 'POST', '/products/bulk', [{"product_name": "product9", "price": 9}]),
+    ('/products/search?q=product', 'PUT', '/products/bulk', [{"id": 2, "product_name": "renamed", "price": 2}]),
+    ('/products/search?q=product', 'DELETE', '/products/bulk', {"ids": [3]}),
+])
+def test_writes_invalidate_cached_reads(client, read, method, path, payload):
+    before = client.get(read)
+    assert client.get(read).headers['X-Cache'] == 'HIT'
+
+    assert client.open(path, method=method, json=payload).status_code in (200, 201)
+
+    after = client.get(read)
+    assert after.headers['X-Cache'] == 'MISS'
+    assert after.data != before.data
+    assert after.headers['ETag'] != before.headers['ETag']
+
+
+def test_cache_stats(client):
+    client.get('/users/1')
+    client.get('/users/1')
+    client.get('/products/1')
+
+    assert client.get('/cache/stats').json == {"entries": 2, "hit_ratio": 1 / 3, "hits": 1, "misses": 2}
+
+
+def test_redis_backend_counts_only_entries():
+    backend = RedisCache(FakeRedis())
+    response_cache = ResponseCache(backend)
+    response_cache.invalidate('user')
+
+    backend.set(response_cache.key('user', 'http://localhost/users'), {"body": "[]"})
+    backend.set(response_cache.key('product', 'http://localhost/products/1'), {"body": "{}"})
+
+    assert len(backend) == 2
+    assert response_cache.stats()["entries"] == 2
@@ -0,0 +1,93 @@
+import logging
+import re
+
+import pytest
+from sqlalchemy import create_engine, event
+
+from Mainpage import create_app, db, instrumentation
+
+
+@pytest.fixture
+def app(make_config):
+    app = create_app(make_config('instrumented', INSTRUMENTATION_ENABLED=True, SLOW_QUERY_THRESHOLD_MS=None))
+    client = app.test_client()
+    client.post('/users', json={"name": "user", "email": "user@example.com"})
+    client.post('/products', json={"product_name": "product", "price": 2})
+    client.post('/orders', json={"user_id": 1})
+    return app
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+def server_timing(response):
+    return dict(re.findall(r'(\w+);dur=([\d.]+)', response.headers['Server-Timing']))
+
+
+def test_server_timing_header(client):
+    response = client.get('/orders/1?expand=products,user')
+
+    assert response.status_code == 200
+    timings = server_timing(response)
+    assert set(timings) == {'db', 'serialize', 'total'}
+    assert float(timings['total']) >= float(timings['db'])
+    assert re.search(r'desc="[1-9]\d* queries"', response.headers['Server-Timing'])
+
+
+def test_metrics_endpoint(client):
+    client.get('/users/1')
+    response = client.get('/metrics')
+    body = response.get_data(as_text=True)
+
+    assert response.status_code == 200
+    assert response.mimetype == 'text/plain'
+    for name in ('http_request_duration_seconds', 'http_request_db_duration_seconds',
+                 'http_request_serialize_duration_seconds', 'http_request_queries'):
+        assert f'# TYPE {name} histogram' in body
+        assert re.search(rf'^{name}_count{{method="GET",route="/users/<int:id>"}} [1-9]', body, re.M)
+    assert '# TYPE db_slow_queries_total counter' in body
+
+
+def test_failing_statements_do_not_leak_start_times(app, client):
+    assert client.post('/orders/1/add_product/1').status_code == 201
+    for _ in range(3):
+        assert client.post('/orders/1/add_product/1').status_code == 400
+
+    with app.app_context():
+        with db.engine.connect() as connection:
+            assert 'query_start_time' not in connection.info
+
+    assert 'queries' in client.get('/orders/1').headers['Server-Timing']
+
+
+def test_listeners_are_registered_per_engine(app):
+    with app.app_context():
+        assert all(
+            event.contains(engine, 'before_cursor_execute', instrumentation.before_cursor_execute)
+            for engine in db.engines.values()
+        )
+
+    other = create_engine('sqlite://')
+    assert not event.contains(other, 'before_cursor_execute', instrumentation.before_cursor_execute)
+    other.dispose()
+
+
+def test_slow_queries_are_logged(make_config, caplog, monkeypatch):
+    monkeypatch.setattr(instrumentation, 'slow_query_threshold', instrumentation.slow_query_threshold)
+    client = create_app(make_config('slow', INSTRUMENTATION_ENABLED=True, SLOW_QUERY_THRESHOLD_MS=0)).test_client()
+    slow_queries = instrumentation.slow_queries.value
+
+    with caplog.at_level(logging.WARNING, logger='instrumentation'):
+        client.get('/users')
+
+    assert instrumentation.slow_queries.value > slow_queries
+    assert any('/users' in record.getMessage() for record in caplog.records)
+
+
+def test_disabled_by_default(make_config):
+    client = create_app(make_config('plain')).test_client()
+
+    assert 'Server-Timing' not in client.get('/users').headers
+    assert client.get('/metrics').status_code == 404
@@ -0,0 +1,83 @@
+import json
+
+import pytest
+
+import Mainpage
+
+
+@pytest.fixture
+def users(client):
+    client.post('/users/bulk', json=[{"name": f"user{i}", "email": f"user{i}@example.com"} for i in range(7)])
+    return client
+
+
+def ndjson(response):
+    return [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+
+@pytest.mark.parametrize('query', ['limit=0', 'limit=-1', 'limit=abc', 'after=-1', 'after=x'])
+def test_invalid_page_args_are_rejected(users, query):
+    response = users.get(f'/users?{query}')
+
+    assert response.status_code == 400
+    assert response.json == {"error": "'limit' must be a positive integer and 'after' a non-negative integer."}
+
+
+def test_pages_follow_the_next_cursor(users):
+    names = []
+    url = '/users?limit=3'
+
+    while url:
+        response = users.get(url)
+        assert response.status_code == 200
+        names += [user['name'] for user in response.json]
+
+        link = response.headers.get('Link')
+        if link is None:
+            assert 'X-Next-Cursor' not in response.headers
+            break
+
+        assert response.headers['X-Next-Cursor'] == str(len(names))
+        assert link == f'<http://localhost/users?limit=3&after={len(names)}>; rel="next"'
+        url = link[1:link.index('>')]
+
+    assert names == [f"user{i}" for i in range(7)]
+
+
+def test_limit_is_capped(users, monkeypatch):
+    monkeypatch.setattr(Mainpage, 'MAX_PAGE_SIZE', 2)
+
+    response = users.get('/users?limit=50')
+
+    assert len(response.json) == 2
+    assert response.headers['X-Next-Cursor'] == '2'
+
+
+def test_next_link_keeps_other_query_args(users):
+    users.post('/products', json={"product_name": "Saw", "price": 4})
+    for order_id in (1, 2):
+        users.post('/orders', json={"user_id": 1})
+        users.post(f'/orders/{order_id}/add_product/1')
+
+    response = users.get('/orders/user/1?expand=products&limit=1')
+
+    assert response.json[0]['products'] == [{"product": {"price": 4.0, "product_name": "Saw"}, "product_id": 1}]
+    assert response.headers['Link'] == '<http://localhost/orders/user/1?expand=products&limit=1&after=1>; rel="next"'
+
+
+@pytest.mark.parametrize('query, expected', [
+    ('', [f"user{i}" for i in range(7)]),
+    ('&limit=3', ["user0", "user1", "user2"]),
+    ('&limit=4&after=2', ["user2", "user3", "user4", "user5"]),
+    ('&after=6', ["user6"]),
+    ('&after=7', []),
+])
+def test_ndjson_streams_in_keyset_batches(users, monkeypatch, query, expected):
+    monkeypatch.setattr(Mainpage, 'STREAM_BATCH_SIZE', 2)
+
+    response = users.get(f'/users?format=ndjson{query}')
+
+    assert response.status_code == 200
+    assert response.mimetype == 'application/x-ndjson'
+    assert 'Link' not in response.headers
+    assert [user['name'] for user in ndjson(response)] == expected
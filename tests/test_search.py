@@ -0,0 +1,112 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+
+from Mainpage import create_app, db, search_products_query
+
+PRODUCTS = [
+    ("Professional Saw", 19.99),
+    ("pro_tool", 5),
+    ("Widget Pro", 12.5),
+    ("PROBE kit", 7.25),
+    ("pro tool", 5),
+    ("Pro", 30),
+    ("100% cotton", 3),
+    ("50_50 blend", 3),
+    ("back\\slash", 1),
+    ("Zebra", 0.5),
+    ("apple", 2),
+    ("Apple", 2),
+    ("Ápple", 2),
+    ("pro-am", 42),
+]
+
+QUERIES = [
+    'q=pro', 'q=PRO&sort=price', 'q=pro&sort=-price', 'q=pro%20t', 'q=pro_', 'q=pro%25', 'q=100%25', 'q=50_',
+    'q=back%5C', 'q=app', 'q=app&sort=-price&limit=1', 'q=pro&min_price=5&max_price=20', 'q=pro&limit=2',
+    'q=z', 'q=missing', 'sort=name', 'sort=price&limit=5', 'min_price=2&max_price=3&sort=-price',
+]
+
+
+@pytest.fixture
+def clients(make_config):
+    clients = []
+
+    for search_index in (False, True):
+        client = create_app(make_config(f'search-{search_index}', SEARCH_INDEX_ENABLED=search_index)).test_client()
+        client.post('/products/bulk', json=[{"product_name": name, "price": price} for name, price in PRODUCTS])
+        client.put('/products/1', json={"product_name": "professional saw", "price": 21})
+        client.delete('/products/bulk', json={"ids": [10]})
+        clients.append(client)
+
+    return clients
+
+
+@pytest.mark.parametrize('query', QUERIES)
+def test_search_index_matches_database(clients, query):
+    database, search_index = (client.get(f'/products/search?{query}') for client in clients)
+
+    assert database.status_code == search_index.status_code == 200
+    assert database.json == search_index.json
+
+
+def test_search_is_a_case_insensitive_name_prefix(clients):
+    for client in clients:
+        names = [product['product_name'] for product in client.get('/products/search?q=pro').json]
+        assert names == ['Pro', 'pro tool', 'pro-am', 'pro_tool', 'PROBE kit', 'professional saw']
+
+
+@pytest.mark.parametrize('query, error', [
+    ('limit=abc', "'limit' must be a positive integer."),
+    ('limit=0', "'limit' must be a positive integer."),
+    ('min_price=abc', "'min_price' must be a finite number."),
+    ('min_price=nan', "'min_price' must be a finite number."),
+    ('max_price=inf', "'max_price' must be a finite number."),
+    ('max_price=-Infinity', "'max_price' must be a finite number."),
+    ('sort=size', "'sort' must be one of -price, name, price."),
+])
+def test_invalid_search_args_are_rejected(client, query, error):
+    response = client.get(f'/products/search?q=pro&{query}')
+
+    assert response.status_code == 400
+    assert response.json == {"error": error}
+
+
+@pytest.mark.parametrize('dialect', [mysql.dialect(), postgresql.dialect(), sqlite.dialect()])
+def test_search_query_binds_text_bounds(dialect):
+    compiled = search_products_query('Pro%', None, None, 'name', 20).compile(dialect=dialect)
+    bounds = set()
+
+    for bind in compiled.binds.values():
+        if isinstance(bind.value, str):
+            processor = bind.type.bind_processor(dialect)
+            bounds.add(processor(bind.value) if processor else bind.value)
+
+    assert bounds == {'pro%', 'pro%\U0010ffff'}
+
+
+def test_name_search_uses_the_folded_name_index(app):
+    with app.app_context():
+        query = search_products_query('pro', None, None, 'name', 20)
+        compiled = query.compile(dialect=db.engine.dialect, compile_kwargs={"literal_binds": True})
+        plan = ' '.join(row[-1] for row in db.session.execute(text(f'EXPLAIN QUERY PLAN {compiled}')))
+
+    assert 'USING INDEX ix_Product_Table_folded_name' in plan
+    assert 'TEMP B-TREE' not in plan
+
+
+def test_products_are_indexed_after_commit(make_config, monkeypatch):
+    app = create_app(make_config('indexed', SEARCH_INDEX_ENABLED=True))
+    client = app.test_client()
+
+    def fail():
+        raise OperationalError('COMMIT', {}, Exception('database is locked'))
+
+    monkeypatch.setattr(db.session, 'commit', fail)
+    assert client.post('/products', json={"product_name": "Pro", "price": 1}).status_code == 500
+    assert len(app.extensions['search_index']) == 0
+
+    monkeypatch.undo()
+    assert client.post('/products', json={"product_name": "Pro", "price": 1}).status_code == 201
+    assert [product['product_name'] for product in client.get('/products/search?q=pro').json] == ['Pro']
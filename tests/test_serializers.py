@@ -0,0 +1,33 @@
+import pytest
+from sqlalchemy import select
+
+from Mainpage import (
+    Order, OrderDetailSchema, Order_Product, Order_ProductSchema, Product_Table, ProductSearchSchema, User, UserSchema,
+    db, order_product_rows, order_summary_rows, product_search_rows, user_rows,
+)
+from serializers import RowSerializer
+
+
+def test_non_column_fields_fail_at_construction():
+    with pytest.raises(TypeError, match="OrderDetailSchema.products is not a column of Order"):
+        RowSerializer(Order, OrderDetailSchema())
+
+
+@pytest.mark.parametrize('model, serializer, schema', [
+    (User, user_rows, UserSchema()),
+    (Product_Table, product_search_rows, ProductSearchSchema()),
+    (Order, order_summary_rows, OrderDetailSchema(exclude=('products', 'user'))),
+    (Order_Product, order_product_rows, Order_ProductSchema()),
+])
+def test_row_serializers_match_schema_dump(app, client, model, serializer, schema):
+    client.post('/users', json={"name": "a", "email": "a@example.com"})
+    client.post('/products', json={"product_name": "Saw", "price": 4})
+    client.post('/orders', json={"user_id": 1})
+    client.post('/orders/1/add_product/1')
+
+    with app.app_context():
+        rows = db.session.execute(select(*serializer.columns)).all()
+        objects = db.session.scalars(select(model)).all()
+
+        assert rows
+        assert serializer.dump(rows) == schema.dump(objects, many=True)